@@ -5,8 +5,12 @@ Python CLI to Create Vinayagar Chaturthi Greeting with Your Name
 Author: Santhosh Kumar
 """
 
-import argparse, os, sys, platform, subprocess, shutil, re, urllib.request
-from PIL import Image, ImageDraw, ImageFont
+import argparse, os, sys, platform, subprocess, shutil, re, tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import requests
+import PIL
+from PIL import Image, ImageDraw, ImageFont, ImageOps
 
 # === Constants ===
 WIDTH, HEIGHT = 1080, 1080
@@ -14,6 +18,7 @@ FOOTER_HEIGHT = 150
 HEADER_HEIGHT = 150
 FONT_URL = "https://github.com/google/fonts/raw/refs/heads/main/ofl/hindmadurai/HindMadurai-Bold.ttf"
 FONT_NAME = "HindMadurai-Bold.ttf"
+NAME_RE = re.compile(r"^[A-Za-z0-9\s.,'\-\u0B80-\u0BFF]+$")
 GANESH_IMAGE = "vinayagar.png"
 GANESH_IMAGE_URL = "https://raw.githubusercontent.com/mskian/python-vinayagar-image/refs/heads/main/vinayagar.png"
 
@@ -27,104 +32,150 @@ TWEMOJI_URLS = {
 HEADER_EMOJI = "twemoji_lamp.png"
 FOOTER_EMOJI = "twemoji_sparkle.png"
 
+# Pillow-SIMD publishes its builds as ".postN" releases of the matching Pillow version
+PILLOW_SIMD = ".post" in PIL.__version__
+
 # === Validation ===
 def validate_name(name: str) -> str:
     name = name.strip()
     if not (2 <= len(name) <= 30):
         raise argparse.ArgumentTypeError("❌ Name must be 2–30 characters.")
-    if not re.match(r"^[A-Za-z0-9\s.,'-\u0B80-\u0BFF]+$", name):
+    if not NAME_RE.match(name):
         raise argparse.ArgumentTypeError("❌ Name contains invalid characters.")
     return name
 
 # === Download helper ===
+# One pooled session so downloads to the same host reuse the TLS connection
+HTTP = requests.Session()
+
+def download(url: str, local_file: str):
+    # unique temp file per call, so concurrent downloads never share a partial file
+    fd, part_file = tempfile.mkstemp(dir=os.path.dirname(local_file) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f, HTTP.get(url, stream=True, timeout=30) as r:
+            r.raise_for_status()
+            for chunk in r.iter_content(chunk_size=64 * 1024):
+                f.write(chunk)
+        os.replace(part_file, local_file)
+    except BaseException:
+        os.unlink(part_file)
+        raise
+
 def ensure_icon(local_file: str, url: str):
     if not os.path.exists(local_file):
         try:
             print(f"📥 Downloading file: {local_file}")
-            urllib.request.urlretrieve(url, local_file)
+            download(url, local_file)
         except Exception as e:
             print(f"⚠ Could not download {local_file}: {e}")
 
 # === Font Handling ===
-def get_font_path() -> str:
-    font_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), FONT_NAME)
+def font_location() -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), FONT_NAME)
+
+def ensure_font():
+    font_path = font_location()
     if not os.path.exists(font_path):
         print("📥 Downloading HindMadurai font...")
         try:
-            urllib.request.urlretrieve(FONT_URL, font_path)
+            download(FONT_URL, font_path)
             print("✅ Font downloaded.")
         except Exception as e:
             print(f"⚠ Font download failed: {e}")
-            return ""
-    return font_path
+
+def get_font_path() -> str:
+    font_path = font_location()
+    return font_path if os.path.exists(font_path) else ""
+
+@lru_cache(maxsize=8)
+def load_font(size: int):
+    font_path = get_font_path()
+    return ImageFont.truetype(font_path, size) if font_path else ImageFont.load_default()
+
+# === Asset Bootstrap ===
+def ensure_assets():
+    # Fetch missing assets concurrently; files already on disk return immediately
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        pool.submit(ensure_font)
+        pool.submit(ensure_icon, HEADER_EMOJI, TWEMOJI_URLS["lamp"])
+        pool.submit(ensure_icon, FOOTER_EMOJI, TWEMOJI_URLS["sparkle"])
+        pool.submit(ensure_icon, GANESH_IMAGE, GANESH_IMAGE_URL)
 
 # === Text with Outline ===
 def draw_text_with_outline(draw, position, text, font, fill, outline_color, outline_width=2):
-    x, y = position
-    for dx in range(-outline_width, outline_width+1):
-        for dy in range(-outline_width, outline_width+1):
-            if dx != 0 or dy != 0:
-                draw.text((x+dx, y+dy), text, font=font, fill=outline_color)
-    draw.text((x, y), text, font=font, fill=fill)
+    draw.text(position, text, font=font, fill=fill,
+              stroke_width=outline_width, stroke_fill=outline_color)
 
 # === Paste Emoji PNG ===
-def paste_icon(base_img: Image.Image, icon_path: str, x: int, y: int, size: int = 60):
+@lru_cache(maxsize=32)
+def load_icon(icon_path: str, size: int) -> Image.Image:
+    return Image.open(icon_path).convert("RGBA").resize((size, size), Image.LANCZOS)
+
+def paste_icons(base_img: Image.Image, icon_path: str, positions, size: int = 60):
     try:
-        icon = Image.open(icon_path).convert("RGBA")
-        icon = icon.resize((size, size), Image.LANCZOS)
-        base_img.paste(icon, (x, y), icon)
+        icon = load_icon(icon_path, size)
+        for x, y in positions:
+            base_img.paste(icon, (x, y), icon)
     except Exception as e:
         print(f"⚠ Could not place emoji icon {icon_path}: {e}")
 
 # === Add Radial Glow Behind Ganesh ===
-def add_radial_glow(base_img: Image.Image, cx: int, cy: int, max_radius: int = 250):
-    glow = Image.new("RGBA", base_img.size, (0, 0, 0, 0))
-    glow_draw = ImageDraw.Draw(glow)
+# radial_gradient("L") reaches 255 at the corners, so the inscribed circle edge sits at 255/sqrt(2)
+GLOW_EDGE = 255 / 2 ** 0.5
 
-    for r in range(max_radius, 0, -10):
-        alpha = int(180 * (r / max_radius))  # fade outward
-        color = (255, 223, 128, max(0, 255 - alpha))  # soft golden
-        glow_draw.ellipse([cx-r, cy-r, cx+r, cy+r], fill=color)
+def radial_glow_tile(max_radius: int) -> Image.Image:
+    size = 2 * max_radius
+    # fade outward from the centre, transparent outside the circle
+    falloff = Image.radial_gradient("L").point(
+        lambda v: max(0, 255 - int(180 * v / GLOW_EDGE)) if v <= GLOW_EDGE else 0
+    ).resize((size, size), Image.BILINEAR)
 
-    base_img.alpha_composite(glow)
+    glow = Image.new("RGBA", (size, size), (255, 223, 128, 0))  # soft golden
+    glow.putalpha(falloff)
+    return glow
 
 # === Place Ganesh Image ===
+@lru_cache(maxsize=4)
+def load_ganesh(new_w: int) -> Image.Image:
+    ganesh = Image.open(GANESH_IMAGE).convert("RGBA")
+    aspect_ratio = ganesh.height / ganesh.width
+    new_h = int(new_w * aspect_ratio)
+    return ganesh.resize((new_w, new_h), Image.LANCZOS)
+
+@lru_cache(maxsize=4)
+def load_ganesh_tile(new_w: int) -> Image.Image:
+    ganesh = load_ganesh(new_w)
+    new_h = ganesh.height
+
+    # smaller glow (0.7 * width) with Ganesh composited on top, centred in one tile
+    radius = int(new_w * 0.7)
+    tile_w, tile_h = max(2 * radius, new_w), max(2 * radius, new_h)
+    tile = Image.new("RGBA", (tile_w, tile_h), (0, 0, 0, 0))
+    tile.alpha_composite(radial_glow_tile(radius), dest=(tile_w // 2 - radius, tile_h // 2 - radius))
+    tile.alpha_composite(ganesh, dest=(tile_w // 2 - new_w // 2, tile_h // 2 - new_h // 2))
+    return tile
+
 def place_ganesh_image(base_img: Image.Image, cx: int, cy: int, scale: float = 0.35):
     try:
-        ganesh = Image.open(GANESH_IMAGE).convert("RGBA")
-        new_w = int(WIDTH * scale)
-        aspect_ratio = ganesh.height / ganesh.width
-        new_h = int(new_w * aspect_ratio)
-        ganesh = ganesh.resize((new_w, new_h), Image.LANCZOS)
-
-        # add smaller glow (0.7 * width)
-        add_radial_glow(base_img, cx, cy, max_radius=int(new_w * 0.7))
-
-        pos_x = cx - new_w // 2
-        pos_y = cy - new_h // 2
-        base_img.paste(ganesh, (pos_x, pos_y), ganesh)
+        tile = load_ganesh_tile(int(WIDTH * scale))
+        base_img.paste(tile, (cx - tile.width // 2, cy - tile.height // 2), tile)
     except Exception as e:
         print(f"⚠ Could not place Ganesh image: {e}")
 
-# === Main Creator ===
-def create_vinayagar_card(name: str, output_path: str):
-    img = Image.new("RGBA", (WIDTH, HEIGHT), (255, 249, 196, 255))
-    draw = ImageDraw.Draw(img)
-
-    # Gradient background
+# === Card Template ===
+# Everything except the footer is identical on every card, so it is drawn once and copied
+@lru_cache(maxsize=1)
+def build_template() -> Image.Image:
+    # Gradient background: Pillow's top-to-bottom ramp, stretched and mapped onto the two colours
     top_color = (255, 204, 229)
     bottom_color = (153, 102, 204)
-    for y in range(HEIGHT):
-        ratio = y / HEIGHT
-        r = int(top_color[0] * (1 - ratio) + bottom_color[0] * ratio)
-        g = int(top_color[1] * (1 - ratio) + bottom_color[1] * ratio)
-        b = int(top_color[2] * (1 - ratio) + bottom_color[2] * ratio)
-        draw.line([(0, y), (WIDTH, y)], fill=(r, g, b))
+    ramp = Image.linear_gradient("L").resize((WIDTH, HEIGHT), Image.BILINEAR)
+    # The card is fully opaque, so render in RGB and blend overlays through their alpha masks
+    img = ImageOps.colorize(ramp, black=top_color, white=bottom_color)
+    draw = ImageDraw.Draw(img)
 
     # Fonts
-    font_path = get_font_path()
-    font_header = ImageFont.truetype(font_path, 50) if font_path else ImageFont.load_default()
-    font_footer = ImageFont.truetype(font_path, 50) if font_path else ImageFont.load_default()
+    font_header = load_font(50)
 
     # Header
     header_text = "Happy Vinayagar Chaturthi"
@@ -135,11 +186,17 @@ def create_vinayagar_card(name: str, output_path: str):
                            font_header, fill="#772041", outline_color="#F0DDD7", outline_width=3)
 
     # Emoji icons (🪔 lamp left/right)
-    paste_icon(img, HEADER_EMOJI, header_x - 80, header_y - 5, size=65)
-    paste_icon(img, HEADER_EMOJI, header_x + tw + 15, header_y - 5, size=65)
+    paste_icons(img, HEADER_EMOJI, [(header_x - 80, header_y - 5), (header_x + tw + 15, header_y - 5)], size=65)
 
     # Ganesh image with smaller glow at center
     place_ganesh_image(img, WIDTH//2, HEIGHT//2)
+    return img
+
+# === Main Creator ===
+def create_vinayagar_card(name: str, output_path: str, png_level: int = 1, image_format: str = "PNG"):
+    img = build_template().copy()
+    draw = ImageDraw.Draw(img)
+    font_footer = load_font(50)
 
     # Footer (name + ✨ sparkles)
     bbox = draw.textbbox((0, 0), name, font=font_footer)
@@ -149,49 +206,111 @@ def create_vinayagar_card(name: str, output_path: str):
     draw_text_with_outline(draw, (footer_x, footer_y), name,
                            font_footer, fill="#1A7220", outline_color="#F5E2A5", outline_width=3)
 
-    paste_icon(img, FOOTER_EMOJI, footer_x - 60, footer_y, size=50)
-    paste_icon(img, FOOTER_EMOJI, footer_x + tw + 15, footer_y, size=50)
+    paste_icons(img, FOOTER_EMOJI, [(footer_x - 60, footer_y), (footer_x + tw + 15, footer_y)], size=50)
 
-    img.save(output_path, "PNG")
+    if image_format == "WEBP":
+        img.save(output_path, "WEBP", quality=90, method=0)
+    else:
+        # zlib level 1 encodes ~30% faster than the default 6 for a somewhat larger file
+        img.save(output_path, "PNG", compress_level=png_level, optimize=False)
     return output_path
 
 # === Open Image ===
+def run_opener(command: str):
+    return lambda path: subprocess.run([command, path], check=False)
+
+def missing_opener(message: str):
+    return lambda path: print(f"⚠ {message} Image saved at: {path}")
+
+@lru_cache(maxsize=1)
+def get_opener():
+    # Resolve the platform viewer once; later calls skip the platform and PATH probes
+    sys_platform = platform.system()
+    if sys_platform == "Darwin":
+        return run_opener("open")
+    if sys_platform == "Windows":
+        return os.startfile  # type: ignore
+    if sys_platform == "Linux":
+        command = "termux-open" if "com.termux" in os.getenv("PREFIX", "") else "xdg-open"
+        if shutil.which(command):
+            return run_opener(command)
+        return missing_opener(f"{command} not found.")
+    return missing_opener("Unsupported platform.")
+
 def open_image(path: str):
     try:
-        sys_platform = platform.system()
-        if sys_platform == "Darwin":
-            subprocess.run(["open", path], check=False)
-        elif sys_platform == "Windows":
-            os.startfile(path)  # type: ignore
-        elif sys_platform == "Linux":
-            if "com.termux" in os.getenv("PREFIX", ""):
-                if shutil.which("termux-open"):
-                    subprocess.run(["termux-open", path], check=False)
-                else:
-                    print(f"⚠ termux-open not found. Image saved at: {path}")
-            else:
-                if shutil.which("xdg-open"):
-                    subprocess.run(["xdg-open", path], check=False)
-                else:
-                    print(f"⚠ xdg-open not found. Image saved at: {path}")
-        else:
-            print(f"⚠ Unsupported platform. Image saved at: {path}")
+        get_opener()(path)
     except Exception as e:
         print(f"⚠ Could not open image: {e}")
 
+# === Batch Helpers ===
+def read_names(lines) -> list:
+    return [line.strip() for line in lines if line.strip()]
+
+def safe_file_part(name: str) -> str:
+    # Leading dots would make hidden files or "."/".." path components
+    return name.replace(" ", "_").lstrip(".")
+
+def batch_output_name(output_name: str, name: str) -> str:
+    if "{name}" not in output_name:
+        stem, ext = os.path.splitext(output_name)
+        output_name = stem + "_{name}" + ext
+    return output_name.replace("{name}", safe_file_part(name))
+
+def warm_caches():
+    # the template already pulls in the font, lamp icon and Ganesh tile
+    build_template()
+    try:
+        load_icon(FOOTER_EMOJI, 50)
+    except OSError:
+        pass  # paste_icons reports the missing icon on each card
+
 # === CLI Entrypoint ===
 def main():
     parser = argparse.ArgumentParser(description="Create Vinayagar Chaturthi Greeting")
-    parser.add_argument("name", type=validate_name, help="Footer name (in English)")
-    parser.add_argument("-o", "--output", default="vinayagar.png", help="Output file name")
+    parser.add_argument("name", nargs="?", type=validate_name, help="Footer name (in English)")
+    parser.add_argument("-o", "--output", default="vinayagar.png",
+                        help="Output file name; in batch mode {name} is replaced by each name")
+    parser.add_argument("--png-level", type=int, default=1, choices=range(10), metavar="0-9",
+                        help="PNG compression level (default: 1, fastest)")
+    parser.add_argument("--format", choices=["png", "webp"], default="png", help="Output image format")
+    parser.add_argument("--names-file", help="Create one greeting per name listed in this file")
+    parser.add_argument("--stdin", action="store_true", help="Create one greeting per name read from stdin")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Cards rendered in parallel in batch mode (default: CPU count)")
     args = parser.parse_args()
 
-    # Ensure emoji icons downloaded
-    ensure_icon(HEADER_EMOJI, TWEMOJI_URLS["lamp"])
-    ensure_icon(FOOTER_EMOJI, TWEMOJI_URLS["sparkle"])
+    if sum([args.name is not None, args.names_file is not None, args.stdin]) != 1:
+        parser.error("give exactly one of: a name, --names-file or --stdin")
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
 
-    # Ensure Ganesh image downloaded
-    ensure_icon(GANESH_IMAGE, GANESH_IMAGE_URL)
+    names = None
+    if args.names_file:
+        try:
+            with open(args.names_file, encoding="utf-8") as f:
+                names = read_names(f)
+        except OSError as e:
+            parser.error(f"could not read {args.names_file}: {e}")
+    elif args.stdin:
+        names = read_names(sys.stdin)
+
+    if names is not None:
+        if not names:
+            parser.error("no names to process")
+        for i, raw in enumerate(names):
+            try:
+                names[i] = validate_name(raw)
+            except argparse.ArgumentTypeError as e:
+                parser.error(f"{raw!r}: {e}")
+            if not safe_file_part(names[i]):
+                parser.error(f"{raw!r}: ❌ Name cannot be used as a file name.")
+
+    if PILLOW_SIMD:
+        print(f"⚡ Pillow-SIMD detected ({PIL.__version__})")
+
+    # Ensure font, emoji icons and Ganesh image downloaded
+    ensure_assets()
 
     # Downloads dir
     sys_platform = platform.system()
@@ -207,10 +326,43 @@ def main():
         downloads_dir = os.path.expanduser("~")
 
     os.makedirs(downloads_dir, exist_ok=True)
-    output_path = os.path.join(downloads_dir, args.output)
+    output_name = args.output
+    if args.format == "webp":
+        output_name = os.path.splitext(output_name)[0] + ".webp"
+    output_path = os.path.join(downloads_dir, output_name)
 
     try:
-        path = create_vinayagar_card(args.name, output_path)
+        if names is not None:
+            # Batch mode: decode the font and images once so every worker starts on a warm cache.
+            # Pillow releases the GIL in resize, compositing and encoding, so threads scale here.
+            # One card per output file, so no two workers ever write the same path.
+            # Keys are case-folded because "Ravi" and "ravi" are one file on Windows and macOS.
+            jobs = {}
+            for name in names:
+                path = os.path.join(downloads_dir, batch_output_name(output_name, name))
+                key = os.path.normcase(path).casefold()
+                if key in jobs:
+                    queued = jobs[key][0]
+                    if queued == name:
+                        print(f"⚠ Skipping duplicate name: {name}")
+                    else:
+                        print(f"⚠ Skipping {name}: it would overwrite the card for {queued}")
+                    continue
+                jobs[key] = (name, path)
+
+            warm_caches()
+            with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+                futures = [
+                    pool.submit(create_vinayagar_card, name, path,
+                                png_level=args.png_level, image_format=args.format.upper())
+                    for name, path in jobs.values()
+                ]
+                for future in futures:
+                    print(f"✅ Greeting saved at {future.result()}")
+            return
+
+        path = create_vinayagar_card(args.name, output_path, png_level=args.png_level,
+                                     image_format=args.format.upper())
         print(f"✅ Greeting saved at {path}")
         open_image(path)
     except Exception as e:
@@ -1,41 +1,90 @@
 import re
-from flask import Flask, abort, request, send_file, render_template_string, jsonify
-from collections import defaultdict, deque
-from typing import Dict
-import tempfile, os, time, hashlib, secrets
-from image import create_vinayagar_card, validate_name
+from flask import Flask, abort, request, send_file, jsonify
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+from functools import lru_cache
+import tempfile, os, time, hashlib, heapq, base64, threading, gzip
+from image import create_vinayagar_card, ensure_assets
 
 app = Flask(__name__)
+# Let a fronting Apache (mod_xsendfile) or lighttpd stream cached PNGs itself when enabled.
+# nginx ignores X-Sendfile (it needs X-Accel-Redirect), so leave this off behind nginx.
+app.config["USE_X_SENDFILE"] = os.getenv("USE_X_SENDFILE") == "1"
 
-_ip_hits: Dict[str, deque] = defaultdict(deque)
+# Fetch card assets once per process so requests never hit the network
+ensure_assets()
+
+_ip_buckets: OrderedDict[str, Tuple[int, float]] = OrderedDict()
 RATE_LIMIT, TIME_WINDOW = 5, 10
+MAX_IPS = 100_000
 
 cache_dir = os.path.join(tempfile.gettempdir(), "flag_cache")
 os.makedirs(cache_dir, exist_ok=True)
 image_cache: Dict[str, str] = {}
+_cache_expiry: Dict[str, float] = {}
+_expiry_heap: List[Tuple[float, str]] = []
 CACHE_TTL = 60 * 60 * 24
+SWEEP_INTERVAL = 60 * 5
+_last_sweep = 0.0
+
+_NAME_RE = re.compile(r"^[\w\s\-\.\u00C0-\uFFFF]+$")
+_VALIDATE_RE = re.compile(r'^[\w\s\-\u0B80-\u0BFF]+$')
+_BAD_CHARS = frozenset('<>"\'&`')
+
+NONCE_BYTES = 16
+_nonce_pool = b""
+_nonce_offset = 0
+_nonce_lock = threading.Lock()
 
 def is_rate_limited(ip: str) -> bool:
-    now = time.time()
-    hits = _ip_hits[ip]
-    while hits and now - hits[0] > TIME_WINDOW:
-        hits.popleft()
-    if len(hits) >= RATE_LIMIT:
+    now = time.monotonic()
+    count, window_start = _ip_buckets.get(ip, (0, now))
+    if now - window_start >= TIME_WINDOW:
+        count, window_start = 0, now
+    if count >= RATE_LIMIT:
         return True
-    hits.append(now)
+    _ip_buckets[ip] = (count + 1, window_start)
+    _ip_buckets.move_to_end(ip)
+    if len(_ip_buckets) > MAX_IPS:
+        _ip_buckets.popitem(last=False)
     return False
 
+@lru_cache(maxsize=4096)
 def get_cache_key(name: str) -> str:
-    return hashlib.sha256(name.encode("utf-8")).hexdigest()
+    return hashlib.blake2b(name.encode("utf-8"), digest_size=16).hexdigest()
+
+def add_to_cache(key: str, path: str):
+    expires_at = time.time() + CACHE_TTL
+    image_cache[key] = path
+    _cache_expiry[key] = expires_at
+    heapq.heappush(_expiry_heap, (expires_at, key))
+
+def send_cached_image(path: str):
+    # Passing the path (not a file object) lets Werkzeug set Content-Length
+    # from a single stat and hand the file to wsgi.file_wrapper for sendfile.
+    # The default ETag is built from mtime and size, so re-rendered cards get a new tag.
+    return send_file(path, mimetype="image/png", conditional=True)
 
 def clean_cache():
+    global _last_sweep
     now = time.time()
-    for key, path in list(image_cache.items()):
-        if not os.path.exists(path) or now - os.path.getmtime(path) > CACHE_TTL:
-            image_cache.pop(key, None)
-            if os.path.exists(path):
+    if now - _last_sweep < SWEEP_INTERVAL:
+        return
+    _last_sweep = now
+    while _expiry_heap and _expiry_heap[0][0] <= now:
+        expires_at, key = heapq.heappop(_expiry_heap)
+        # Skip stale heap entries left behind when a key was re-cached
+        if _cache_expiry.get(key) != expires_at:
+            continue
+        _cache_expiry.pop(key, None)
+        path = image_cache.pop(key, None)
+        if path:
+            try:
                 os.remove(path)
+            except FileNotFoundError:
+                pass
 
+@lru_cache(maxsize=4096)
 def validate_name(raw: str) -> str:
     """
     Validate and sanitize the name.
@@ -46,7 +95,9 @@ def validate_name(raw: str) -> str:
     if not raw:
         raise ValueError("Empty name")
 
-    if not re.match(r'^[\w\s\-\u0B80-\u0BFF]+$', raw):
+    # Plain ASCII names skip the Unicode regex entirely
+    is_plain_ascii = raw.isascii() and raw.replace(" ", "").replace("-", "").isalnum()
+    if not is_plain_ascii and not _VALIDATE_RE.match(raw):
         raise ValueError("Invalid characters")
 
     if len(raw) > 50:
@@ -54,30 +105,45 @@ def validate_name(raw: str) -> str:
 
     return raw
 
+_CSP_TEMPLATE = (
+    "default-src 'self'; "
+    "style-src 'self' https://fonts.googleapis.com 'nonce-%(nonce)s'; "
+    "font-src https://fonts.gstatic.com; "
+    "script-src 'self' 'nonce-%(nonce)s'; "
+    "img-src 'self' data: blob: https://vinayagar.vercel.app 'nonce-%(nonce)s'; "
+    "object-src 'none'; base-uri 'self';"
+)
+
+_STATIC_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "Referrer-Policy": "no-referrer",
+    "Cache-Control": "public, max-age=86400"
+    # "Strict-Transport-Security": "max-age=63072000; includeSubDomains; preload"
+}
+
+def make_nonce() -> str:
+    # Draw nonces from a refillable os.urandom pool: one syscall per 256 requests,
+    # still cryptographically random (a seeded PRNG would make nonces predictable)
+    global _nonce_pool, _nonce_offset
+    with _nonce_lock:
+        if _nonce_offset + NONCE_BYTES > len(_nonce_pool):
+            _nonce_pool = os.urandom(NONCE_BYTES * 256)
+            _nonce_offset = 0
+        chunk = _nonce_pool[_nonce_offset:_nonce_offset + NONCE_BYTES]
+        _nonce_offset += NONCE_BYTES
+    return base64.urlsafe_b64encode(chunk).rstrip(b"=").decode("ascii")
+
 @app.after_request
 def set_security_headers(response):
     nonce = getattr(request, "csp_nonce", "")
-    csp = (
-        f"default-src 'self'; "
-        f"style-src 'self' https://fonts.googleapis.com 'nonce-{nonce}'; "
-        f"font-src https://fonts.gstatic.com; "
-        f"script-src 'self' 'nonce-{nonce}'; "
-        f"img-src 'self' data: blob: https://vinayagar.vercel.app 'nonce-{nonce}'; "
-        "object-src 'none'; base-uri 'self';"
-    )
-    response.headers.update({
-        "Content-Security-Policy": csp,
-        "X-Content-Type-Options": "nosniff",
-        "X-Frame-Options": "DENY",
-        "Referrer-Policy": "no-referrer",
-        "Cache-Control": "public, max-age=86400"
-        # "Strict-Transport-Security": "max-age=63072000; includeSubDomains; preload"
-    })
+    response.headers.update(_STATIC_HEADERS)
+    response.headers["Content-Security-Policy"] = _CSP_TEMPLATE % {"nonce": nonce}
     return response
 
 @app.before_request
 def generate_nonce():
-    request.csp_nonce = secrets.token_urlsafe(16)
+    request.csp_nonce = make_nonce()
 
 HTML_FORM = """
 <!DOCTYPE html>
@@ -392,47 +458,64 @@ HTML_SHARE = """
 </html>
 """
 
+# Compile both templates once; only the nonce and share values change per request
+_FORM_TPL = app.jinja_env.from_string(HTML_FORM)
+_SHARE_TPL = app.jinja_env.from_string(HTML_SHARE)
+
+def html_response(html: str):
+    if request.accept_encodings.best_match(["gzip"]):
+        response = app.response_class(gzip.compress(html.encode("utf-8"), compresslevel=6), mimetype="text/html")
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = app.response_class(html, mimetype="text/html")
+    # Both variants are publicly cacheable, so shared caches must key on Accept-Encoding
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
 @app.route("/")
 def index():
-    return render_template_string(HTML_FORM, nonce=request.csp_nonce)
+    return html_response(_FORM_TPL.render(nonce=request.csp_nonce))
 
-@app.route("/generate")
-def generate_flag():
+def serve_greeting(raw_name: str):
     client_ip = request.headers.get("X-Forwarded-For", request.remote_addr)
 
     if is_rate_limited(client_ip):
         print(f"⚠️ Rate limit hit: {client_ip}")
         return jsonify({"error": "Too many requests"}), 429
 
-    raw_name = request.args.get("name", "").strip()
+    raw_name = raw_name.strip()
 
     if not raw_name:
         print("❌ Empty name received")
         return jsonify({"error": "Name cannot be empty"}), 400
 
-    if any(ch in raw_name for ch in ['<', '>', '"', "'", '&', '`']):
-        print(f"⚠️ Possible XSS attempt from {client_ip}: {raw_name}")
-        return jsonify({"error": "Invalid characters in name"}), 400
-
-    if not re.match(r"^[\w\s\-\.\u00C0-\uFFFF]+$", raw_name):
+    # _NAME_RE never matches the XSS characters, so valid names pass in one scan
+    if not _NAME_RE.match(raw_name):
+        if not _BAD_CHARS.isdisjoint(raw_name):
+            print(f"⚠️ Possible XSS attempt from {client_ip}: {raw_name}")
+            return jsonify({"error": "Invalid characters in name"}), 400
         print(f"⚠️ Disallowed characters from {client_ip}: {raw_name}")
         return jsonify({"error": "Name contains unsupported characters"}), 400
 
     try:
-
         name = validate_name(raw_name)
 
         clean_cache()
         cache_key = get_cache_key(name)
 
-        if cache_key in image_cache and os.path.exists(image_cache[cache_key]):
-            return send_file(image_cache[cache_key], mimetype="image/png")
+        cached_path = image_cache.get(cache_key)
+        if cached_path:
+            try:
+                return send_cached_image(cached_path)
+            except FileNotFoundError:
+                image_cache.pop(cache_key, None)
 
         image_path = os.path.join(cache_dir, f"{cache_key}.png")
-        create_vinayagar_card(name, image_path)
-        image_cache[cache_key] = image_path
+        # Cached PNGs are served many times, so spend the extra encode time on size
+        create_vinayagar_card(name, image_path, png_level=6)
+        add_to_cache(cache_key, image_path)
 
-        return send_file(image_path, mimetype="image/png")
+        return send_cached_image(image_path)
 
     except ValueError as ve:
         print(f"❌ Validation error: {ve}")
@@ -442,45 +525,14 @@ def generate_flag():
         print(f"❌ Internal error: {e}")
         return jsonify({"error": "An internal error occurred"}), 500
 
+@app.route("/generate")
+def generate_flag():
+    return serve_greeting(request.args.get("name", ""))
+
 @app.route("/image/<path:raw_name>")
 def generate_flag_slug(raw_name):
-    client_ip = request.headers.get("X-Forwarded-For", request.remote_addr)
-
-    if is_rate_limited(client_ip):
-        return jsonify({"error": "Too many requests"}), 429
+    return serve_greeting(raw_name)
 
-    raw_name = raw_name.strip()
-
-    if not raw_name:
-        return jsonify({"error": "Name cannot be empty"}), 400
-
-    if any(ch in raw_name for ch in ['<', '>', '"', "'", '&', '`']):
-        return jsonify({"error": "Invalid characters in name"}), 400
-
-    if not re.match(r"^[\w\s\-\.\u00C0-\uFFFF]+$", raw_name):
-        return jsonify({"error": "Name contains unsupported characters"}), 400
-
-    try:
-        name = validate_name(raw_name)
-
-        clean_cache()
-        cache_key = get_cache_key(name)
-
-        if cache_key in image_cache and os.path.exists(image_cache[cache_key]):
-            return send_file(image_cache[cache_key], mimetype="image/png")
-
-        image_path = os.path.join(cache_dir, f"{cache_key}.png")
-        create_vinayagar_card(name, image_path)
-        image_cache[cache_key] = image_path
-
-        return send_file(image_path, mimetype="image/png")
-
-    except ValueError as ve:
-        return jsonify({"error": str(ve)}), 400
-    except Exception as e:
-        print(f"❌ Internal error: {e}")
-        return jsonify({"error": "An internal error occurred"}), 500
-    
 @app.route("/share/<path:raw_name>")
 def share_page(raw_name):
     try:
@@ -493,13 +545,12 @@ def share_page(raw_name):
     image_url = f"https://vinayagar.vercel.app/image/{safe_name}"
     share_url = f"https://vinayagar.vercel.app/share/{safe_name}"
 
-    return render_template_string(
-        HTML_SHARE,
+    return html_response(_SHARE_TPL.render(
         nonce=request.csp_nonce,
         name=safe_name,
         image_url=image_url,
         share_url=share_url
-    )
+    ))
 
 if __name__ == "__main__":
     app.run()
@@ -5,8 +5,8 @@ Python CLI to Create Vinayagar Chaturthi Greeting with Your Name
 Author: Santhosh Kumar
 """
 
-import argparse, os, sys, platform, subprocess, shutil, re, urllib.request
-from PIL import Image, ImageDraw, ImageFont
+import argparse, os, sys, platform, subprocess, shutil, re, urllib.request, inspect
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
 
 # === Constants ===
 WIDTH, HEIGHT = 1080, 1080
@@ -59,13 +59,34 @@ def get_font_path() -> str:
     return font_path
 
 # === Text with Outline ===
+# Pillow 6.2+ can stroke text natively; older releases fall back to a dilated mask
+STROKE_SUPPORTED = "stroke_width" in inspect.signature(ImageDraw.ImageDraw.text).parameters
+
 def draw_text_with_outline(draw, position, text, font, fill, outline_color, outline_width=2):
+    if STROKE_SUPPORTED:
+        draw.text(position, text, font=font, fill=fill,
+                  stroke_width=outline_width, stroke_fill=outline_color)
+    else:
+        # rasterise the text once, then grow it for the outline
+        draw_text_with_mask_outline(draw, position, text, font, fill, outline_color, outline_width)
+
+def draw_text_with_mask_outline(draw, position, text, font, fill, outline_color, outline_width=2):
     x, y = position
-    for dx in range(-outline_width, outline_width+1):
-        for dy in range(-outline_width, outline_width+1):
-            if dx != 0 or dy != 0:
-                draw.text((x+dx, y+dy), text, font=font, fill=outline_color)
-    draw.text((x, y), text, font=font, fill=fill)
+    w, h = font.getsize(text)
+    mask = Image.new("L", (w + 2 * outline_width, h + 2 * outline_width), 0)
+    ImageDraw.Draw(mask).text((outline_width, outline_width), text, font=font, fill=255)
+    outline = mask.filter(ImageFilter.MaxFilter(2 * outline_width + 1))
+
+    origin = (x - outline_width, y - outline_width)
+    draw.bitmap(origin, outline, fill=outline_color)
+    draw.bitmap(origin, mask, fill=fill)
+
+# === Text Width ===
+def text_width(draw, text, font) -> int:
+    # getlength (Pillow 8+) is a single shaping pass; textsize was removed in Pillow 10
+    if hasattr(font, "getlength"):
+        return int(font.getlength(text))
+    return draw.textsize(text, font=font)[0]
 
 # === Paste Emoji PNG ===
 def paste_icon(base_img: Image.Image, icon_path: str, x: int, y: int, size: int = 60):
@@ -131,7 +152,7 @@ def create_vinayagar_card(name: str, output_path: str):
 
     # Header
     header_text = "Happy Vinayagar Chaturthi"
-    tw, th = draw.textsize(header_text, font=font_header)
+    tw = text_width(draw, header_text, font_header)
     header_x, header_y = (WIDTH - tw) // 2, 80
     draw_text_with_outline(draw, (header_x, header_y), header_text,
                            font_header, fill="#772041", outline_color="#F0DDD7", outline_width=3)
@@ -144,7 +165,7 @@ def create_vinayagar_card(name: str, output_path: str):
     place_ganesh_image(img, WIDTH//2, HEIGHT//2)
 
     # Footer (name + ✨ sparkles)
-    tw, th = draw.textsize(name, font=font_footer)
+    tw = text_width(draw, name, font_footer)
     footer_y = HEIGHT - FOOTER_HEIGHT + 30
     footer_x = (WIDTH - tw) // 2
     draw_text_with_outline(draw, (footer_x, footer_y), name,